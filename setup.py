@@ -1,4 +1,26 @@
-from setuptools import setup
+from pathlib import Path
+
+from setuptools import Extension, setup
+
+HERE = Path(__file__).parent
+README = HERE / 'README.md'
+INFERENCE_PYX = HERE / 'tap_redash_inference.pyx'
+
+# Schema inference has an optional compiled implementation; installs without
+# Cython or the .pyx source, or where the build fails, use the pure-Python
+# code in tap_redash
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    cythonize = None
+
+if cythonize is not None and INFERENCE_PYX.exists():
+    ext_modules = cythonize(
+        [Extension('tap_redash_inference', [INFERENCE_PYX.name], optional=True)],
+        language_level=3,
+    )
+else:
+    ext_modules = []
 
 setup(
     name='tap-redash',
@@ -8,10 +30,14 @@ setup(
     author='Brendan Hogan',
     classifiers=['Programming Language :: Python :: 3 :: Only'],
     py_modules=['tap_redash'],
-    long_description=open('README.md').read(),
+    ext_modules=ext_modules,
+    long_description=README.read_text(encoding='utf-8') if README.exists() else '',
+    long_description_content_type='text/markdown',
     install_requires=[
         'singer-python>=2.1.4',
         'requests>=2.20.0',
+        'orjson>=3.10',
+        'ijson>=3.1',
     ],
     entry_points='''
         [console_scripts]
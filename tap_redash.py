@@ -1,9 +1,26 @@
-import logging
+import argparse
+import functools
 import json
+import logging
+import re
+import socket
 import sys
-from typing import Any, Dict, List, Optional
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Generator, Iterable, List, Optional
+import ijson
+import orjson
 import requests as req
+from requests.adapters import HTTPAdapter
 import singer
+import urllib3
+from urllib3.util.retry import Retry
+
+try:
+    from tap_redash_inference import singer_type_for_value as _compiled_singer_type_for_value
+except ImportError:  # pure-Python install, the extension was not built
+    _compiled_singer_type_for_value = None
 
 logger = singer.get_logger()
 logger.setLevel(logging.WARNING)
@@ -11,36 +28,191 @@ logging.getLogger("urllib3").setLevel(logging.WARNING)
 logging.getLogger("requests").setLevel(logging.WARNING)
 
 REQUIRED_CONFIG_KEYS = ['BASE_URL', 'API_KEY']
-args = singer.utils.parse_args(REQUIRED_CONFIG_KEYS)
+
+# Number of rows sampled per query for schema inference
+MAX_SCAN = 100
+
+# Consecutive rows without a new type after which a scalar column stops being scanned
+STABLE_SCAN = 20
+
+# The C-backed ijson parsers reject integers beyond 64 bits (e.g. Postgres
+# numeric columns); the pure-Python backend parses them, more slowly
+_IJSON_BIGINT = ijson.get_backend('python')
+
+# Anything that is not alphanumeric or an underscore (same set as str.isalnum)
+_SANITIZE_RE = re.compile(r'\W+')
+
+# Redash writes the result id ahead of its rows: {"query_result": {"id": N, ...
+_RESULT_ID_RE = re.compile(rb'"query_result"\s*:\s*\{\s*"id"\s*:\s*(\d+)')
+_RESULT_ID_PEEK = 4096
+
+_NULL_SCHEMA = {"type": "null"}
+_BOOLEAN_SCHEMA = {"type": "boolean"}
+_INTEGER_SCHEMA = {"type": "integer"}
+_NUMBER_SCHEMA = {"type": "number"}
+_STRING_SCHEMA = {"type": "string"}
+
+# Exact-type lookup for scalar values; subclasses fall back to isinstance checks
+_TYPE_DISPATCH: Dict[type, Dict[str, Any]] = {
+    type(None): _NULL_SCHEMA,
+    bool: _BOOLEAN_SCHEMA,
+    int: _INTEGER_SCHEMA,
+    float: _NUMBER_SCHEMA,
+    str: _STRING_SCHEMA,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _merge_type_names(type_names: frozenset) -> Dict[str, Any]:
+    """Merged schema for inputs that carry nothing but a type."""
+    return {"type": sorted(type_names | {"null"})}
+
+
+def _python_singer_type_for_value(value: Any) -> Dict[str, Any]:
+    """Infer JSON Schema from a single Python value (no merging).
+
+    Scalar schemas are shared between calls and must not be mutated.
+    """
+    leaf = _TYPE_DISPATCH.get(type(value))
+    if leaf is not None:
+        return leaf
+
+    # Nested values are walked with an explicit stack instead of recursion.
+    # Each entry is (value, parent, key): the value's schema is stored in
+    # parent[key] once built, and containers push their children.
+    root: Dict[str, Any] = {}
+    stack = deque([(value, root, "schema")])
+    while stack:
+        value, parent, key = stack.pop()
+        leaf = _TYPE_DISPATCH.get(type(value))
+        if leaf is not None:
+            parent[key] = leaf
+        elif isinstance(value, bool):
+            parent[key] = _BOOLEAN_SCHEMA
+        elif isinstance(value, int):
+            parent[key] = _INTEGER_SCHEMA
+        elif isinstance(value, float):
+            parent[key] = _NUMBER_SCHEMA
+        elif isinstance(value, str):
+            parent[key] = _STRING_SCHEMA
+        elif isinstance(value, dict):
+            properties: Dict[str, Any] = {}
+            parent[key] = {
+                "type": "object",
+                "properties": properties,
+                "additionalProperties": False
+            }
+            for k, v in value.items():
+                properties[k] = None  # reserve the slot to keep key order
+                stack.append((v, properties, k))
+        elif isinstance(value, list):
+            if not value:
+                parent[key] = {"type": "array"}
+            elif value[0] is None:
+                # if list is empty, default items type to strings
+                parent[key] = {
+                    "type": "array",
+                    "items": {"type": "array", "items": {"type": "string"}}
+                }
+            else:
+                array_schema = {"type": "array"}
+                parent[key] = array_schema
+                stack.append((value[0], array_schema, "items"))
+        else:
+            parent[key] = _STRING_SCHEMA
+
+    return root["schema"]
+
+
+class _PrefixedReader:
+    """File-like reader that replays bytes already read before the rest of a stream."""
+
+    def __init__(self, prefix: bytes, raw: Any) -> None:
+        self._prefix = prefix
+        self._raw = raw
+
+    def read(self, size: int = -1) -> bytes:
+        if not self._prefix:
+            return self._raw.read(size)
+        if size is None or size < 0:
+            data, self._prefix = self._prefix + self._raw.read(), b''
+        else:
+            data, self._prefix = self._prefix[:size], self._prefix[size:]
+        return data
+
+
+class NoDelayAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled sockets disable Nagle's algorithm and send TCP keepalives."""
+
+    socket_options = [
+        (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    ]
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        kwargs['socket_options'] = self.socket_options
+        super().init_poolmanager(*args, **kwargs)
 
 
 class Redash:
 
-    def __init__(self) -> None:
+    def __init__(self, args: argparse.Namespace) -> None:
         try:
             self._config: Dict[str, Any] = args.config
         except Exception as e:
             raise IOError(e)
 
-        self._session = req.Session()
         self._timeout = (10, 60)  # (connect, read) seconds
         self._base_url = self._config['BASE_URL'].rstrip('/')
         self._api_key = self._config['API_KEY']
+        self._queries_url = f"{self._base_url}/api/queries"
+
+        max_workers = self._config.get('MAX_WORKERS', 8)
+        if isinstance(max_workers, str) and max_workers.strip().isdigit():
+            max_workers = int(max_workers)
+        if isinstance(max_workers, bool) or not isinstance(max_workers, int) or max_workers < 1:
+            logger.critical("MAX_WORKERS must be a positive integer, got %r", max_workers)
+            raise ValueError(f"MAX_WORKERS must be a positive integer, got {max_workers!r}")
+        self._max_workers: int = max_workers
+
+        self._session = req.Session()
+        # Room for one pooled connection per discovery worker, and retry
+        # transient gateway errors from the Redash server
+        adapter = NoDelayAdapter(
+            pool_connections=4,
+            pool_maxsize=self._max_workers,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+        )
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Authorization': f'Key {self._api_key}',
+        })
         
         self.query_id_filter: Optional[str] = self._config.get('QUERY_ID')
 
+        # When a sync generates its own catalog, result sets that fit entirely
+        # in the discovery sample are kept so they are not fetched twice
+        self._cache_enabled = not args.discover and not args.properties
+        self._data_cache: Dict[str, List[Dict[str, Any]]] = {}
+
     # -------- Fetch Available Queries -------- #
 
+    def _get_json(self, url: str) -> Any:
+        """GET a URL and decode its JSON body straight from the raw response."""
+        with self._session.get(url, timeout=self._timeout, stream=True) as resp:
+            resp.raise_for_status()
+            # Skips the extra bytes copy that building resp.content would make
+            return orjson.loads(resp.raw.read(decode_content=True))
+
     def _get_available_queries(self) -> List[Dict[str, Any]]:
         """Fetch list of all available queries from Redash."""
-        url = f"{self._base_url}/api/queries"
-        params = {'api_key': self._api_key}
+        url = self._queries_url
         
         try:
-            resp = self._session.get(url, params=params, timeout=self._timeout)
-            resp.raise_for_status()
-            payload = resp.json()
-        except req.RequestException as e:
+            payload = self._get_json(url)
+        except (req.RequestException, urllib3.exceptions.HTTPError) as e:
             logger.critical("Error fetching Redash queries list: %s", e)
             raise
         except ValueError as e:
@@ -66,147 +238,208 @@ class Redash:
         if self.query_id_filter:
             # Fetch single query metadata
             query_id = str(self.query_id_filter)
-            url = f"{self._base_url}/api/queries/{query_id}"
-            params = {'api_key': self._api_key}
+            url = f"{self._queries_url}/{query_id}"
             
             try:
-                resp = self._session.get(url, params=params, timeout=self._timeout)
-                resp.raise_for_status()
-                query = resp.json()
+                query = self._get_json(url)
                 return [query]
-            except req.RequestException as e:
+            except (req.RequestException, urllib3.exceptions.HTTPError) as e:
                 logger.warning("Error fetching query %s: %s", query_id, e)
                 return []
+            except ValueError as e:
+                logger.warning("Invalid JSON from query %s: %s", query_id, e)
+                return []
         else:
             # Fetch all queries
             return self._get_available_queries()
 
     # -------- Fetch Query Data -------- #
 
-    def _get_query_data(self, query_id: str) -> List[Dict[str, Any]]:
-        """Fetch the results for a specific query."""
-        url = f"{self._base_url}/api/queries/{query_id}/results.json"
-        params = {'api_key': self._api_key}
-        
-        try:
-            resp = self._session.get(url, params=params, timeout=self._timeout)
-            resp.raise_for_status()
-            payload = resp.json()
-        except req.RequestException as e:
-            logger.warning("Error fetching query %s results: %s", query_id, e)
-            return []
-        except ValueError as e:
-            logger.warning("Invalid JSON from query %s results: %s", query_id, e)
-            return []
-
-        try:
-            rows = payload['query_result']['data']['rows']
-            if not isinstance(rows, list):
-                logger.warning("Query %s rows payload is not a list.", query_id)
-                return []
-        except (KeyError, TypeError) as e:
-            logger.warning("Unexpected payload shape for query %s: %s", query_id, e)
-            return []
+    def _get_query_data(
+        self, query_id: str, sampling: bool = False
+    ) -> Generator[Dict[str, Any], None, bool]:
+        """
+        Stream the result rows for a specific query, one row at a time.
+        Errors before the first row are logged and end the stream. Later errors
+        are re-raised so a sync fails rather than emit a partial table, unless
+        `sampling`, where the rows read so far are enough.
+        Returns True once every row was read, False when an error ended the stream.
+        """
+        url = f"{self._queries_url}/{query_id}/results.json"
+        result_id = None
+        row_count = 0
+        backend = ijson
+        while True:
+            try:
+                with self._session.get(url, timeout=self._timeout, stream=True) as resp:
+                    resp.raise_for_status()
+                    # Let urllib3 undo gzip/deflate while ijson reads from the socket
+                    resp.raw.decode_content = True
+                    # Note which result is being read, then hand ijson the whole body
+                    prefix = resp.raw.read(_RESULT_ID_PEEK)
+                    match = _RESULT_ID_RE.search(prefix)
+                    if result_id is None and match:
+                        result_id = match.group(1).decode()
+                    body = _PrefixedReader(prefix, resp.raw)
+                    # Redash returns {"query_result": {"data": {"rows": [...]}}}
+                    rows = backend.items(body, 'query_result.data.rows.item', use_float=True)
+                    # After a parser switch, skip the rows that were already yielded
+                    for row in islice(rows, row_count, None):
+                        yield row
+                        row_count += 1
+                return True
+            except ijson.JSONError as e:
+                error = e
+                if backend.backend != _IJSON_BIGINT.backend:
+                    if result_id is not None:
+                        # Re-read this exact result so skipped rows line up
+                        # even if the query has been refreshed since
+                        url = f"{self._queries_url}/{query_id}/results/{result_id}.json"
+                    elif row_count and not sampling:
+                        logger.critical(
+                            "Query %s results need the Python JSON parser after %d rows, "
+                            "but the result id is unknown: %s", query_id, row_count, e
+                        )
+                        raise
+                    logger.info(
+                        "Re-reading query %s results with the Python JSON parser: %s", query_id, e
+                    )
+                    backend = _IJSON_BIGINT
+                    continue
+            except (req.RequestException, urllib3.exceptions.HTTPError) as e:
+                error = e
 
-        return rows
+            if row_count and not sampling:
+                logger.critical(
+                    "Query %s results failed after %d rows: %s", query_id, row_count, error
+                )
+                raise error
+            logger.warning("Error reading query %s results: %s", query_id, error)
+            return False
 
     # -------- Schema Inference -------- #
 
-    @staticmethod
-    def _singer_type_for_value(value: Any) -> Dict[str, Any]:
-        """Infer JSON Schema from a single Python value (no merging)."""
-        if value is None:
-            return {"type": "null"}
-        if isinstance(value, bool):
-            return {"type": "boolean"}
-        if isinstance(value, int):
-            return {"type": "integer"}
-        if isinstance(value, float):
-            return {"type": "number"}
-        if isinstance(value, str):
-            return {"type": "string"}
-        if isinstance(value, dict):
-            return {
-                "type": "object",
-                "properties": {
-                    k: Redash._singer_type_for_value(v)
-                    for k, v in value.items()
-                },
-                "additionalProperties": False
-            }
-        if isinstance(value, list):
-            if not value:
-                return {"type": "array"}
-            
-            if value[0] is None:
-                items_schema = {"type": "array", "items": {"type": "string"}} # if list is empty, default items type to strings
-            else:
-                items_schema = Redash._singer_type_for_value(value[0])
-            
-            return {
-                "type": "array",
-                "items": items_schema
-            }
-        return {"type": "string"}
+    # Compiled extension when it was built, pure-Python implementation otherwise
+    _singer_type_for_value = staticmethod(
+        _compiled_singer_type_for_value or _python_singer_type_for_value
+    )
 
     @staticmethod
     def _merge_schemas(schemas: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Merge multiple schemas into one with combined types, always nullable."""
-        merged: Dict[str, Any] = {}
-
-        # collect all types
-        types = []
-        for s in schemas:
-            t = s.get("type")
-            if isinstance(t, list):
-                types.extend(t)
-            else:
-                types.append(t)
+        """Merge multiple schemas into one with combined types, always nullable.
 
-        # always allow null
-        types.append("null")
+        Type-only results are memoized and shared; callers must not mutate them.
+        """
+        # Nested schemas are merged with an explicit stack instead of recursion.
+        # Each entry is (schemas, parent, key): the merge of `schemas` is stored
+        # in parent[key] once built, and object properties and array items that
+        # need merging push their own entries.
+        root: Dict[str, Any] = {}
+        stack = deque([(schemas, root, "schema")])
+        while stack:
+            schemas, parent, key = stack.pop()
+
+            # Copies beyond the second never change the result, so a homogeneous
+            # column of shared leaf schemas collapses to a constant-size merge
+            if len(schemas) > 2 and all(s is schemas[0] for s in schemas[1:]):
+                schemas = schemas[:2]
+
+            # Type-only inputs merge to a result that depends on the type names alone
+            if all(len(s) == 1 and "type" in s for s in schemas):
+                type_names = set()
+                for s in schemas:
+                    t = s["type"]
+                    if isinstance(t, list):
+                        type_names.update(t)
+                    else:
+                        type_names.add(t)
+                parent[key] = _merge_type_names(frozenset(type_names))
+                continue
 
-        merged["type"] = sorted(set(types))
+            merged: Dict[str, Any] = {}
+            parent[key] = merged
 
-        # merge object properties if needed
-        if "object" in types:
-            merged["properties"] = {}
+            # collect all types
+            types = []
             for s in schemas:
-                if "properties" in s:
-                    for k, v in s["properties"].items():
-                        if k not in merged["properties"]:
-                            merged["properties"][k] = v
-                        else:
-                            merged["properties"][k] = Redash._merge_schemas(
-                                [merged["properties"][k], v]
-                            )
-            merged["additionalProperties"] = False
-
-        # merge array items if needed
-        if "array" in types:
-            item_schemas = [s.get("items") for s in schemas if "items" in s]
-            if item_schemas:
-                merged["items"] = Redash._merge_schemas(item_schemas)
-
-        return merged
-
-    def _infer_properties(self, sample_rows: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Infer schema properties from sample rows."""
-        MAX_SCAN = min(100, len(sample_rows))
-        union: Dict[str, set] = {}
-
-        for i in range(MAX_SCAN):
-            row = sample_rows[i]
+                t = s.get("type")
+                if isinstance(t, list):
+                    types.extend(t)
+                else:
+                    types.append(t)
+
+            # always allow null
+            types.append("null")
+
+            merged["type"] = sorted(set(types))
+
+            # merge object properties if needed
+            if "object" in types:
+                property_schemas: Dict[str, List[Dict[str, Any]]] = {}
+                for s in schemas:
+                    if "properties" in s:
+                        for k, v in s["properties"].items():
+                            property_schemas.setdefault(k, []).append(v)
+                merged["properties"] = {}
+                for k, values in property_schemas.items():
+                    if len(values) == 1:
+                        # A property from a single schema is kept as is
+                        merged["properties"][k] = values[0]
+                    else:
+                        merged["properties"][k] = None  # placeholder keeps key order
+                        stack.append((values, merged["properties"], k))
+                merged["additionalProperties"] = False
+
+            # merge array items if needed
+            if "array" in types:
+                item_schemas = [s.get("items") for s in schemas if "items" in s]
+                if item_schemas:
+                    merged["items"] = None
+                    stack.append((item_schemas, merged, "items"))
+
+        return root["schema"]
+
+    @staticmethod
+    def _infer_properties(sample_rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Infer schema properties from the first rows of a result set."""
+        # Transpose rows into per-column value lists
+        columns: Dict[str, list] = defaultdict(list)
+        # Non-null types seen per column and how many rows each set has held unchanged
+        seen_types: Dict[str, set] = defaultdict(set)
+        stable_count: Dict[str, int] = defaultdict(int)
+        stable: set = set()
+
+        for row in islice(sample_rows, MAX_SCAN):
             if not isinstance(row, dict):
                 continue
             for k, v in row.items():
-                schema = Redash._singer_type_for_value(v)
-                union.setdefault(k, []).append(schema)
-
-        return {
-            k: Redash._merge_schemas(schemas)
-            for k, schemas in union.items()
-        }
+                if k in stable:
+                    continue
+                columns[k].append(v)
+                if v is None:
+                    # A null says nothing about the column's type, so it
+                    # neither counts toward nor resets stability
+                    continue
+                types = seen_types[k]
+                if type(v) not in types:
+                    types.add(type(v))
+                    stable_count[k] = 0
+                    continue
+                stable_count[k] += 1
+                # Nested values can change shape without changing type, so
+                # only purely scalar columns are retired early
+                if stable_count[k] >= STABLE_SCAN and all(t in _TYPE_DISPATCH for t in types):
+                    stable.add(k)
+
+        properties: Dict[str, Any] = {}
+        for k, values in columns.items():
+            schemas = [_TYPE_DISPATCH.get(t) for t in set(map(type, values))]
+            if None in schemas:
+                # Nested values and scalar subclasses need a per-value walk
+                schemas = [Redash._singer_type_for_value(v) for v in values]
+            properties[k] = Redash._merge_schemas(schemas)
+
+        return properties
 
     def generate_stream_entry(self, query: Dict[str, Any]) -> Dict[str, Any]:
         """Generate a stream entry for the Singer catalog from a query object."""
@@ -215,8 +448,7 @@ class Redash:
         
         # Sanitize stream name (remove special chars, use underscores)
         stream_name = query_name.replace(' ', '_').replace('-', '_')
-        stream_name = ''.join(c for c in stream_name if c.isalnum() or c == '_')
-        stream_name = stream_name.lower()
+        stream_name = _SANITIZE_RE.sub('', stream_name).lower()
         
         # If stream name is empty after sanitization, use query_id
         if not stream_name:
@@ -224,13 +456,27 @@ class Redash:
 
         # Fetch sample data to infer schema
         logger.info("Fetching sample data for query %s: %s", query_id, query_name)
-        data = self._get_query_data(query_id)
-        
-        if not data:
-            properties: Dict[str, Any] = {}
+        rows = self._get_query_data(query_id, sampling=True)
+        sample: List[Dict[str, Any]] = []
+        complete = False
+        try:
+            # One extra row tells whether the sample holds the whole result set
+            while len(sample) <= MAX_SCAN:
+                sample.append(next(rows))
+        except StopIteration as stop:
+            # Only a clean end of stream means the sample is the full table
+            complete = stop.value
+        finally:
+            # Release the connection without reading past the sample
+            rows.close()
+
+        if self._cache_enabled and complete:
+            self._data_cache[query_id] = sample
+
+        properties: Dict[str, Any] = self._infer_properties(sample)
+
+        if not properties:
             logger.warning("No data for query %s, using empty schema", query_id)
-        else:
-            properties = self._infer_properties(data)
 
         key_props = self._config.get("key_properties", [])
         if not isinstance(key_props, list):
@@ -280,20 +526,71 @@ class Redash:
         else:
             logger.info("Found %d queries to include in catalog", len(queries))
             streams = []
-            for query in queries:
-                try:
-                    stream_entry = self.generate_stream_entry(query)
-                    streams.append(stream_entry)
-                except Exception as e:
-                    query_id = query.get('id', 'unknown')
-                    logger.warning("Failed to generate stream for query %s: %s", query_id, e)
-                    continue
+            # Sample fetches are independent, so run them concurrently while
+            # collecting results in query order to keep the catalog stable
+            with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+                futures = [
+                    (query, executor.submit(self.generate_stream_entry, query))
+                    for query in queries
+                ]
+                for query, future in futures:
+                    try:
+                        streams.append(future.result())
+                    except Exception as e:
+                        query_id = query.get('id', 'unknown')
+                        logger.warning("Failed to generate stream for query %s: %s", query_id, e)
+                        continue
             
             catalog = {"streams": streams}
 
-        print(json.dumps(catalog, indent=2))
+        # Catalogs are machine-read, so indent only when asked to
+        option = orjson.OPT_APPEND_NEWLINE
+        if self._config.get('PRETTY_CATALOG'):
+            option |= orjson.OPT_INDENT_2
+
+        try:
+            output = orjson.dumps(catalog, option=option)
+        except orjson.JSONEncodeError:
+            # orjson refuses schemas nested deeper than its recursion limit
+            indent = 2 if self._config.get('PRETTY_CATALOG') else None
+            output = json.dumps(catalog, indent=indent).encode('utf-8') + b"\n"
+
+        sys.stdout.flush()
+        sys.stdout.buffer.write(output)
+        sys.stdout.buffer.flush()
         return catalog
 
+    @staticmethod
+    def _write_records(stream_name: str, rows: Iterable[Dict[str, Any]], chunk: int = 1000) -> int:
+        """Write RECORD messages straight to stdout, flushing every `chunk` rows."""
+        # Drain anything singer has written through the text layer first
+        sys.stdout.flush()
+        out = sys.stdout.buffer
+        record_count = 0
+        for row in rows:
+            message = {"type": "RECORD", "stream": stream_name, "record": row}
+            try:
+                out.write(orjson.dumps(message, option=orjson.OPT_APPEND_NEWLINE))
+            except orjson.JSONEncodeError:
+                # orjson rejects integers beyond 64 bits; the stdlib encoder does not
+                out.write(json.dumps(message).encode('utf-8') + b"\n")
+            record_count += 1
+            if record_count % chunk == 0:
+                out.flush()
+        out.flush()
+        return record_count
+
+    @staticmethod
+    def _root_selected(stream: Dict[str, Any]) -> bool:
+        """Read the `selected` flag from the stream's root-level metadata entry."""
+        # The last root entry wins. generate_stream_entry appends the root
+        # entry after every property breadcrumb, so scanning from the end
+        # usually stops at the first entry checked.
+        for metadata_entry in reversed(stream.get("metadata", [])):
+            if not metadata_entry.get("breadcrumb"):  # Root level metadata
+                return metadata_entry.get("metadata", {}).get("selected", True)
+        return True
+
     def output_to_stream(self, catalog: Dict[str, Any]) -> None:
         """Emit schema and records for selected streams."""
         if not catalog or "streams" not in catalog:
@@ -301,14 +598,7 @@ class Redash:
             return
 
         for stream in catalog["streams"]:
-            # Check if stream is selected
-            selected = True
-            if "metadata" in stream:
-                for metadata_entry in stream["metadata"]:
-                    if not metadata_entry.get("breadcrumb"):  # Root level metadata
-                        selected = metadata_entry.get("metadata", {}).get("selected", True)
-
-            if not selected:
+            if not self._root_selected(stream):
                 logger.info("Skipping unselected stream: %s", stream["stream"])
                 continue
 
@@ -322,17 +612,21 @@ class Redash:
             # Write schema
             singer.write_schema(stream_name, schema, key_props)
 
-            # Fetch and write records
-            data = self._get_query_data(tap_stream_id)
-            if data:
-                singer.write_records(stream_name, data)
-                logger.info("Wrote %d records for stream %s", len(data), stream_name)
+            # Reuse rows already read during discovery, otherwise fetch them
+            rows = self._data_cache.pop(tap_stream_id, None)
+            if rows is None:
+                rows = self._get_query_data(tap_stream_id)
+
+            record_count = self._write_records(stream_name, rows)
+            if record_count:
+                logger.info("Wrote %d records for stream %s", record_count, stream_name)
             else:
                 logger.warning("No records found for stream %s", stream_name)
 
 
 def main() -> None:
-    rdash = Redash()
+    args = singer.utils.parse_args(REQUIRED_CONFIG_KEYS)
+    rdash = Redash(args)
 
     if args.discover:
         rdash.do_discover()
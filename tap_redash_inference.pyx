@@ -0,0 +1,79 @@
+# cython: language_level=3
+"""Compiled counterpart of tap_redash._python_singer_type_for_value.
+
+Built only when Cython is available; tap_redash falls back to the pure-Python
+implementation otherwise, so the two must produce identical schemas.
+"""
+from cpython.bool cimport PyBool_Check
+from cpython.dict cimport PyDict_Check
+from cpython.float cimport PyFloat_Check
+from cpython.list cimport PyList_Check
+from cpython.long cimport PyLong_Check
+from cpython.unicode cimport PyUnicode_Check
+
+# Scalar schemas are shared between calls and must not be mutated
+cdef dict _NULL_SCHEMA = {"type": "null"}
+cdef dict _BOOLEAN_SCHEMA = {"type": "boolean"}
+cdef dict _INTEGER_SCHEMA = {"type": "integer"}
+cdef dict _NUMBER_SCHEMA = {"type": "number"}
+cdef dict _STRING_SCHEMA = {"type": "string"}
+
+
+cpdef dict singer_type_for_value(object value):
+    """Infer JSON Schema from a single Python value (no merging)."""
+    cdef list stack
+    cdef dict root, parent, properties, array_schema
+    cdef object key
+
+    if value is None:
+        return _NULL_SCHEMA
+    if PyBool_Check(value):
+        return _BOOLEAN_SCHEMA
+    if PyLong_Check(value):
+        return _INTEGER_SCHEMA
+    if PyFloat_Check(value):
+        return _NUMBER_SCHEMA
+    if PyUnicode_Check(value):
+        return _STRING_SCHEMA
+
+    # Same explicit-stack walk as the Python version: (value, parent, key)
+    root = {}
+    stack = [(value, root, "schema")]
+    while stack:
+        value, parent, key = stack.pop()
+        if value is None:
+            parent[key] = _NULL_SCHEMA
+        elif PyBool_Check(value):
+            parent[key] = _BOOLEAN_SCHEMA
+        elif PyLong_Check(value):
+            parent[key] = _INTEGER_SCHEMA
+        elif PyFloat_Check(value):
+            parent[key] = _NUMBER_SCHEMA
+        elif PyUnicode_Check(value):
+            parent[key] = _STRING_SCHEMA
+        elif PyDict_Check(value):
+            properties = {}
+            parent[key] = {
+                "type": "object",
+                "properties": properties,
+                "additionalProperties": False
+            }
+            for k, v in value.items():
+                properties[k] = None
+                stack.append((v, properties, k))
+        elif PyList_Check(value):
+            if not value:
+                parent[key] = {"type": "array"}
+            elif value[0] is None:
+                parent[key] = {
+                    "type": "array",
+                    "items": {"type": "array", "items": {"type": "string"}}
+                }
+            else:
+                array_schema = {"type": "array"}
+                parent[key] = array_schema
+                stack.append((value[0], array_schema, "items"))
+        else:
+            parent[key] = _STRING_SCHEMA
+
+    return root["schema"]
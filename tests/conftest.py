@@ -0,0 +1,79 @@
+import argparse
+import io
+import json
+
+import pytest
+import urllib3
+
+from tap_redash import Redash
+
+BASE_URL = "http://redash.test"
+
+
+class FakeRaw:
+    """Response body that raises once `body` is exhausted when `truncated`."""
+
+    def __init__(self, body, truncated=False):
+        self._body = io.BytesIO(body)
+        self._truncated = truncated
+        self.decode_content = False
+
+    def read(self, size=-1, decode_content=None):
+        data = self._body.read(size)
+        if not data and size != 0 and self._truncated:
+            raise urllib3.exceptions.ProtocolError("Connection broken: IncompleteRead")
+        return data
+
+
+class FakeResponse:
+
+    def __init__(self, body, truncated=False):
+        self.raw = FakeRaw(body, truncated)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    """Serves canned bodies by URL; a list of bodies is served one per request."""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.requests = []
+
+    def get(self, url, **kwargs):
+        self.requests.append(url)
+        route = self.routes[url]
+        if isinstance(route, list):
+            route = route.pop(0)
+        if isinstance(route, Exception):
+            raise route
+        return route
+
+
+def results_body(rows, result_id=1):
+    return json.dumps({"query_result": {"id": result_id, "data": {"rows": rows}}}).encode()
+
+
+def results_url(query_id):
+    return f"{BASE_URL}/api/queries/{query_id}/results.json"
+
+
+@pytest.fixture
+def make_tap():
+    def make(routes, discover=False, properties=None, **config):
+        args = argparse.Namespace(
+            config={"BASE_URL": BASE_URL, "API_KEY": "key", **config},
+            discover=discover,
+            properties=properties,
+        )
+        tap = Redash(args)
+        tap._session = FakeSession(routes)
+        return tap
+    return make
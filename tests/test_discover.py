@@ -0,0 +1,17 @@
+import json
+
+from conftest import BASE_URL, FakeResponse, results_body, results_url
+
+
+def test_catalog_deeper_than_orjson_limit_is_written(make_tap, capsysbinary):
+    value = 1
+    for _ in range(300):
+        value = {"n": value}
+    tap = make_tap({
+        f"{BASE_URL}/api/queries/1": FakeResponse(b'{"id": 1, "name": "deep"}'),
+        results_url(1): FakeResponse(results_body([{"c": value}] * 2)),
+    }, discover=True, QUERY_ID="1")
+
+    catalog = tap.do_discover()
+
+    assert json.loads(capsysbinary.readouterr().out) == catalog
@@ -0,0 +1,59 @@
+import pytest
+import requests
+import urllib3
+
+from tap_redash import MAX_SCAN
+
+from conftest import BASE_URL, FakeResponse, results_body, results_url
+
+QUERIES_URL = f"{BASE_URL}/api/queries"
+QUERIES = b'{"results": [{"id": 1, "name": "q"}]}'
+
+
+def test_complete_sample_is_reused_by_sync(make_tap, capsysbinary):
+    rows = [{"a": 1}, {"a": 2}]
+    tap = make_tap({QUERIES_URL: FakeResponse(QUERIES), results_url(1): FakeResponse(results_body(rows))})
+
+    tap.output_to_stream(tap.do_discover())
+
+    assert tap._session.requests.count(results_url(1)) == 1
+    assert capsysbinary.readouterr().out.count(b'"type":"RECORD"') == 2
+
+
+def test_truncated_sample_is_not_cached(make_tap, capsysbinary):
+    body = results_body([{"a": 1}, {"a": 2}])[:-3]
+    tap = make_tap({
+        QUERIES_URL: FakeResponse(QUERIES),
+        results_url(1): [FakeResponse(body, truncated=True), FakeResponse(body, truncated=True)],
+    })
+
+    catalog = tap.do_discover()
+    assert "1" not in tap._data_cache
+
+    # Sync refetches and fails instead of emitting the partial table
+    with pytest.raises(urllib3.exceptions.ProtocolError):
+        tap.output_to_stream(catalog)
+
+
+def test_failed_sample_is_not_cached(make_tap, capsysbinary):
+    tap = make_tap({
+        QUERIES_URL: FakeResponse(QUERIES),
+        results_url(1): [
+            requests.ConnectionError("refused"),
+            FakeResponse(results_body([{"a": 1}])),
+        ],
+    })
+
+    tap.output_to_stream(tap.do_discover())
+
+    assert tap._session.requests.count(results_url(1)) == 2
+    assert capsysbinary.readouterr().out.count(b'"type":"RECORD"') == 1
+
+
+def test_sample_larger_than_scan_is_not_cached(make_tap, capsysbinary):
+    body = results_body([{"a": i} for i in range(MAX_SCAN + 1)])
+    tap = make_tap({QUERIES_URL: FakeResponse(QUERIES), results_url(1): [FakeResponse(body), FakeResponse(body)]})
+
+    tap.do_discover()
+
+    assert tap._data_cache == {}
@@ -0,0 +1,64 @@
+from tap_redash import MAX_SCAN, STABLE_SCAN, Redash
+
+
+def infer(rows):
+    return Redash._infer_properties(iter(rows))
+
+
+def test_leading_nulls_do_not_settle_column_type():
+    rows = [{"c": None}] * 25 + [{"c": "x"}] * 75
+    assert infer(rows) == {"c": {"type": ["null", "string"]}}
+
+
+def test_leading_nulls_then_numbers():
+    rows = [{"c": None}] * 30 + [{"c": 1.5}] * 70
+    assert infer(rows) == {"c": {"type": ["null", "number"]}}
+
+
+def test_all_null_column_is_nullable_only():
+    assert infer([{"c": None}] * MAX_SCAN) == {"c": {"type": ["null"]}}
+
+
+def test_settled_scalar_column_stops_scanning():
+    # A type first seen after the column settled is not sampled
+    rows = [{"c": 1}] * (STABLE_SCAN + 1) + [{"c": "x"}] * 10
+    assert infer(rows) == {"c": {"type": ["integer", "null"]}}
+
+
+def test_nested_columns_are_scanned_in_full():
+    rows = [{"c": {"a": 1}}] * (STABLE_SCAN + 1) + [{"c": {"b": "x"}}]
+    schema = infer(rows)["c"]
+    assert set(schema["properties"]) == {"a", "b"}
+
+
+def test_empty_first_row_does_not_end_scan():
+    rows = [{}] + [{"a": 1, "b": "x"}] * 50
+    assert infer(rows) == {
+        "a": {"type": ["integer", "null"]},
+        "b": {"type": ["null", "string"]},
+    }
+
+
+def test_column_appearing_after_others_settle_is_inferred():
+    rows = [{"a": 1}] * (STABLE_SCAN + 5) + [{"a": 1, "b": "x"}] * 5
+    assert infer(rows) == {
+        "a": {"type": ["integer", "null"]},
+        "b": {"type": ["null", "string"]},
+    }
+
+
+def nest(depth, leaf):
+    value = leaf
+    for _ in range(depth):
+        value = {"n": value}
+    return value
+
+
+def test_deeply_nested_values_merge_without_recursion():
+    schema = infer([{"c": nest(1200, 1)}, {"c": nest(1200, "x")}])["c"]
+    depth = 0
+    while "properties" in schema:
+        schema = schema["properties"]["n"]
+        depth += 1
+    assert depth == 1200
+    assert schema == {"type": ["integer", "null", "string"]}
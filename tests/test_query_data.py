@@ -0,0 +1,74 @@
+import ijson
+import pytest
+import requests
+import urllib3
+
+from conftest import BASE_URL, FakeResponse, results_body, results_url
+
+BIG = 123456789012345678901234567890
+ROWS = [{"a": 1}, {"a": 2}, {"a": BIG}]
+
+needs_c_backend = pytest.mark.skipif(
+    ijson.backend == "python", reason="the Python ijson backend parses big integers directly"
+)
+
+
+def read(tap, sampling=False):
+    """Drain _get_query_data, returning its rows and its completion flag."""
+    rows = []
+    gen = tap._get_query_data("1", sampling=sampling)
+    while True:
+        try:
+            rows.append(next(gen))
+        except StopIteration as stop:
+            return rows, stop.value
+
+
+def test_complete_read(make_tap):
+    tap = make_tap({results_url(1): FakeResponse(results_body([{"a": 1}]))})
+    assert read(tap) == ([{"a": 1}], True)
+
+
+def test_error_before_first_row_ends_stream(make_tap):
+    tap = make_tap({results_url(1): requests.ConnectionError("refused")})
+    assert read(tap) == ([], False)
+
+
+def test_error_after_first_row_fails_sync(make_tap):
+    body = results_body([{"a": 1}, {"a": 2}])[:-3]
+    tap = make_tap({results_url(1): FakeResponse(body, truncated=True)})
+    with pytest.raises(urllib3.exceptions.ProtocolError):
+        read(tap)
+
+
+def test_error_after_first_row_ends_sample(make_tap):
+    body = results_body([{"a": 1}, {"a": 2}])[:-3]
+    tap = make_tap({results_url(1): FakeResponse(body, truncated=True)})
+    assert read(tap, sampling=True) == ([{"a": 1}, {"a": 2}], False)
+
+
+@needs_c_backend
+def test_big_integers_reread_the_same_result(make_tap):
+    # The query has been refreshed by the time the rows are re-read
+    refreshed = FakeResponse(results_body([{"a": 9}] * 3, result_id=8))
+    tap = make_tap({
+        results_url(1): [FakeResponse(results_body(ROWS, result_id=7)), refreshed],
+        f"{BASE_URL}/api/queries/1/results/7.json": FakeResponse(results_body(ROWS, result_id=7)),
+    })
+    assert read(tap) == (ROWS, True)
+    assert tap._session.requests == [results_url(1), f"{BASE_URL}/api/queries/1/results/7.json"]
+
+
+@needs_c_backend
+def test_big_integers_without_result_id_fail_sync(make_tap):
+    body = b'{"query_result": {"data": {"rows": [{"a": 1}, {"a": %d}]}}}' % BIG
+    tap = make_tap({results_url(1): [FakeResponse(body), FakeResponse(body)]})
+    with pytest.raises(ijson.JSONError):
+        read(tap)
+
+
+@needs_c_backend
+def test_big_integers_without_result_id_sample_refetches(make_tap):
+    body = b'{"query_result": {"data": {"rows": [{"a": 1}, {"a": %d}]}}}' % BIG
+    tap = make_tap({results_url(1): [FakeResponse(body), FakeResponse(body)]})
+    assert read(tap, sampling=True) == ([{"a": 1}, {"a": BIG}], True)
@@ -0,0 +1,43 @@
+from tap_redash import Redash
+
+from conftest import FakeResponse, results_body, results_url
+
+
+def root(selected):
+    return {"breadcrumb": [], "metadata": {"selected": selected}}
+
+
+PROPERTY = {"breadcrumb": ["properties", "a"], "metadata": {"inclusion": "available"}}
+
+
+def test_root_entry_after_properties():
+    assert Redash._root_selected({"metadata": [PROPERTY, root(False)]}) is False
+
+
+def test_root_entry_before_properties():
+    assert Redash._root_selected({"metadata": [root(False), PROPERTY]}) is False
+
+
+def test_last_root_entry_wins():
+    assert Redash._root_selected({"metadata": [root(False), PROPERTY, root(True)]}) is True
+    assert Redash._root_selected({"metadata": [root(True), PROPERTY, root(False)]}) is False
+
+
+def test_selected_by_default():
+    assert Redash._root_selected({"metadata": [PROPERTY]}) is True
+    assert Redash._root_selected({"metadata": [{"breadcrumb": [], "metadata": {}}]}) is True
+    assert Redash._root_selected({}) is True
+
+
+def test_unselected_streams_are_not_synced(make_tap, capsysbinary):
+    tap = make_tap({results_url(2): FakeResponse(results_body([{"a": 1}]))}, properties=True)
+    schema = {"type": "object", "properties": {"a": {"type": ["integer", "null"]}}}
+    catalog = {"streams": [
+        {"stream": "one", "tap_stream_id": "1", "schema": schema, "metadata": [root(False)]},
+        {"stream": "two", "tap_stream_id": "2", "schema": schema, "metadata": [root(True)]},
+    ]}
+
+    tap.output_to_stream(catalog)
+
+    assert tap._session.requests == [results_url(2)]
+    assert b'"one"' not in capsysbinary.readouterr().out
@@ -0,0 +1,19 @@
+import pytest
+
+from conftest import FakeResponse, results_body, results_url
+
+
+@pytest.mark.parametrize("name, stream", [
+    ("Big Query-One", "big_query_one"),
+    ("Sales (2024) / EU", "sales_2024__eu"),
+    ("Café total", "café_total"),
+    ("!!!", "query_1"),
+])
+def test_stream_names_are_sanitized(make_tap, name, stream):
+    tap = make_tap({results_url(1): FakeResponse(results_body([]))})
+    assert tap.generate_stream_entry({"id": 1, "name": name})["stream"] == stream
+
+
+def test_unnamed_query_uses_its_id(make_tap):
+    tap = make_tap({results_url(1): FakeResponse(results_body([]))})
+    assert tap.generate_stream_entry({"id": 1})["stream"] == "query_1"
@@ -0,0 +1,31 @@
+import json
+
+from tap_redash import Redash
+
+
+def records(out):
+    return [json.loads(line) for line in out.splitlines()]
+
+
+def test_records_are_written_one_per_line(capsysbinary):
+    rows = [{"a": i, "b": "x"} for i in range(5)]
+
+    assert Redash._write_records("s", iter(rows), chunk=2) == 5
+
+    assert records(capsysbinary.readouterr().out) == [
+        {"type": "RECORD", "stream": "s", "record": row} for row in rows
+    ]
+
+
+def test_no_rows_writes_nothing(capsysbinary):
+    assert Redash._write_records("s", iter([])) == 0
+    assert capsysbinary.readouterr().out == b""
+
+
+def test_integers_beyond_64_bits_fall_back_to_stdlib_json(capsysbinary):
+    big = 123456789012345678901234567890
+    rows = [{"a": 1}, {"a": big}, {"a": 2}]
+
+    assert Redash._write_records("s", iter(rows)) == 3
+
+    assert [m["record"] for m in records(capsysbinary.readouterr().out)] == rows